@@ -19,189 +19,337 @@ reproduce the archival process from scratch, you can skip this file and
 start directly from the provided orkut_communities.csv.
 """
 
-import requests
-from bs4 import BeautifulSoup
-import time
+import asyncio
+import httpx
+import os
+from selectolax.lexbor import LexborHTMLParser
 import csv
+import logging
+import re
+import time
 from urllib.parse import urljoin, urlparse
 
+logger = logging.getLogger(__name__)
+
+# Matched by Lexbor in C, without building an attribute dict per anchor
+COMMUNITY_LINK_SELECTOR = 'a.typoSectionTitleFont'
+# Fallback patterns as one selector group, so the tree is walked once
+FALLBACK_SELECTOR = (
+    'a[href*="Community"], a[href*="community"], '
+    '.community-name, .community-title, '
+    'a[title*="community"], a[title*="Community"]'
+)
+# Transient archive errors worth retrying, with exponential backoff from 0.3 s
+RETRY_STATUSES = frozenset({500, 502, 503, 504})
+RETRY_BACKOFF = 0.3
+MAX_RETRIES = 3
+# Letter index pages, used with a known letter URL template
+INDEX_LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0'
+# Letter name in an index URL: the text after the last 'l-' up to the next '.'
+LETTER_RE = re.compile(r'.*l-([^.]*)')
+
+class RateLimiter:
+    """Token bucket allowing at most `rate` requests per second"""
+    def __init__(self, rate):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.rate = rate
+        # Hold at least one token, or rates below 1 req/s could never acquire
+        self.capacity = max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Wait for a token; the bucket refills at `rate` tokens per second"""
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
 class OrkutCommunityScraper:
-    def __init__(self, base_url):
+    def __init__(self, base_url, filename='orkut_communities.csv', max_concurrency=8, requests_per_second=2,
+                 letter_url_template=None):
         self.base_url = base_url
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
-        self.communities = []
-        
-    def get_page(self, url):
-        """Fetch a page with error handling"""
+        self._base_parsed = urlparse(base_url)
+        self._base_prefix = f"{self._base_parsed.scheme}://{self._base_parsed.netloc}"
+        self.filename = filename
+        # e.g. '.../l-{letter}.html'; when set, the index page is not fetched
+        self.letter_url_template = letter_url_template
+        # One pooled HTTP/2 transport for the single Internet Archive host:
+        # a few multiplexed connections carry every in-flight request, so
+        # TCP and TLS setup is not repeated per request
+        transport = httpx.AsyncHTTPTransport(
+            http1=False,
+            http2=True,
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=4),
+            retries=3,
+        )
+        self.client = httpx.AsyncClient(
+            transport=transport,
+            headers={
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+                # Archived HTML compresses well; brotli needs httpx[brotli]
+                'Accept-Encoding': 'gzip, deflate, br'
+            },
+            timeout=10,
+            follow_redirects=True,
+        )
+        # Cap in-flight requests to stay gentle with the Internet Archive
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self.communities = set()
+        # URLs already requested: True once fetched, False for dead (404) mementos
+        self._seen_urls = {}
+        # Names are streamed here while scraping so a crash keeps partial
+        # results without touching the target file
+        self._partial_path = f"{filename}.partial"
+        self._csvfile = None
+        self._writer = None
+        
+    async def get_page(self, url):
+        """Fetch a page with error handling, skipping URLs already requested"""
+        if url in self._seen_urls:
+            reason = "already fetched" if self._seen_urls[url] else "known 404"
+            logger.debug("Skipping %s (%s)", url, reason)
+            return None
+        
+        # Claim the URL before awaiting so concurrent callers do not refetch it
+        self._seen_urls[url] = True
         try:
-            response = self.session.get(url, timeout=10)
+            for attempt in range(MAX_RETRIES + 1):
+                await self.rate_limiter.acquire()
+                async with self.semaphore:
+                    response = await self.client.get(url)
+                if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                    break
+                delay = RETRY_BACKOFF * 2 ** attempt
+                logger.debug("Retrying %s in %.1fs after HTTP %d", url, delay, response.status_code)
+                await asyncio.sleep(delay)
             response.raise_for_status()
             return response
-        except requests.RequestException as e:
-            print(f"Error fetching {url}: {e}")
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                self._seen_urls[url] = False
+            else:
+                del self._seen_urls[url]
+            logger.warning("Error fetching %s: %s", url, e)
             return None
+        except httpx.HTTPError as e:
+            del self._seen_urls[url]
+            logger.warning("Error fetching %s: %s", url, e)
+            return None
+    
+    def decode_page(self, response):
+        """Decode page bytes once with the advertised charset, skipping sniffing"""
+        try:
+            return response.content.decode(response.charset_encoding or 'utf-8', errors='replace')
+        except LookupError:
+            return response.content.decode('utf-8', errors='replace')
     
-    def extract_communities_from_page(self, soup):
-        """Extract community names from a page"""
-        communities = []
+    def extract_communities_from_page(self, tree):
+        """Extract community names from a parsed page"""
+        communities = set()
         
         # Look for community links with the specific class
-        community_links = soup.find_all('a', class_='typoSectionTitleFont')
-        for link in community_links:
-            name = link.get_text(strip=True)
+        for link in tree.css(COMMUNITY_LINK_SELECTOR):
+            name = link.text(strip=True)
             if name and len(name) > 2:
-                communities.append(name)
+                communities.add(name)
         
         # Fallback: Look for community container
         if not communities:
-            community_container = soup.find('div', class_='listCommunityContainer')
+            community_container = tree.css_first('div.listCommunityContainer')
             if community_container:
                 # Find all community links within the container
-                all_links = community_container.find_all('a')
+                all_links = community_container.css('a')
                 for link in all_links:
                     # Skip pagination links
-                    if 'paginationSeparator' in link.get('class', []):
+                    if 'paginationSeparator' in (link.attributes.get('class') or '').split():
                         continue
                         
-                    name = link.get_text(strip=True)
+                    name = link.text(strip=True)
                     if name and len(name) > 2 and name not in ['next >', '< previous', 'first', 'last']:
-                        communities.append(name)
+                        communities.add(name)
         
         # Fallback: Look for various patterns that might contain community names
         if not communities:
-            selectors = [
-                'a[href*="Community"]',
-                'a[href*="community"]',
-                '.community-name',
-                '.community-title',
-                'a[title*="community"]',
-                'a[title*="Community"]'
-            ]
-            
-            for selector in selectors:
-                elements = soup.select(selector)
-                for element in elements:
-                    name = element.get_text(strip=True)
-                    if name and len(name) > 2:
-                        communities.append(name)
+            for element in tree.css(FALLBACK_SELECTOR):
+                name = element.text(strip=True)
+                if name and len(name) > 2:
+                    communities.add(name)
         
-        return list(set(communities))  # Remove duplicates
+        return communities
     
-    def find_index_letter_links(self, soup):
+    def _resolve(self, href):
+        """Resolve an href against the base URL, skipping urljoin for the common cases"""
+        if href.startswith(('http://', 'https://')):
+            return href
+        if href.startswith('/') and not href.startswith('//'):
+            return self._base_prefix + href
+        return urljoin(self.base_url, href)
+    
+    def find_index_letter_links(self, tree):
         """Find index letter links (A, B, C, etc.)"""
         links = []
         
         # Look for index letter links
-        index_container = soup.find('div', class_='indexLettersContainer')
+        index_container = tree.css_first('div.indexLettersContainer')
         if index_container:
-            for link in index_container.find_all('a', class_='indexLetters'):
-                href = link.get('href')
+            for link in index_container.css('a.indexLetters'):
+                href = link.attributes.get('href')
                 if href:
-                    full_url = urljoin(self.base_url, href)
+                    full_url = self._resolve(href)
                     links.append(full_url)
         
         return links
     
-    def find_pagination_links(self, soup):
+    def find_pagination_links(self, tree):
         """Find pagination links (next page)"""
         links = []
         
         # Look for pagination links
-        pagination_links = soup.find_all('a', class_='paginationSeparator')
+        pagination_links = tree.css('a.paginationSeparator')
         for link in pagination_links:
-            href = link.get('href')
-            if href and 'next' in link.get_text().lower():
-                full_url = urljoin(self.base_url, href)
+            href = link.attributes.get('href')
+            if href and 'next' in link.text().lower():
+                full_url = self._resolve(href)
                 links.append(full_url)
         
         return links
     
-    def scrape_letter_page(self, letter_url, letter):
+    async def scrape_letter_page(self, letter_url, letter):
         """Scrape all communities from a letter page and its pagination"""
         page_num = 1
-        current_url = letter_url
-        letter_communities = []
+        letter_communities = set()
         
-        while current_url:
-            print(f"  Scraping {letter} - page {page_num}: {current_url}")
-            
-            response = self.get_page(current_url)
-            if not response:
-                break
+        logger.debug("Scraping %s - page %d: %s", letter, page_num, letter_url)
+        next_page = asyncio.create_task(self.get_page(letter_url))
+        
+        while next_page:
+            try:
+                response = await next_page
+                if not response:
+                    break
                 
-            soup = BeautifulSoup(response.content, 'html.parser')
-            page_communities = self.extract_communities_from_page(soup)
-            letter_communities.extend(page_communities)
-            
-            print(f"    Found {len(page_communities)} communities on this page")
-            
-            # Look for next page link
-            next_links = self.find_pagination_links(soup)
-            current_url = next_links[0] if next_links else None
-            
-            page_num += 1
-            time.sleep(1)  # Be respectful to the server
-            
-            # Safety limit to avoid infinite loops
-            if page_num > 50:
-                print(f"    Reached page limit for letter {letter}")
-                break
+                current_page = page_num
+                page_text = self.decode_page(response)
+                tree = LexborHTMLParser(page_text)
+                
+                # Look for next page link first so its download overlaps with
+                # extracting communities from the current page
+                next_links = self.find_pagination_links(tree)
+                next_page = None
+                if next_links:
+                    # Safety limit to avoid infinite loops
+                    if page_num >= 50:
+                        logger.info("Reached page limit for letter %s", letter)
+                    else:
+                        page_num += 1
+                        logger.debug("Scraping %s - page %d: %s", letter, page_num, next_links[0])
+                        next_page = asyncio.create_task(self.get_page(next_links[0]))
+                
+                page_communities = self.extract_communities_from_page(tree)
+                letter_communities.update(page_communities)
+                
+                logger.debug("Found %d communities on %s page %d", len(page_communities), letter, current_page)
+            except BaseException:
+                # Do not leave a prefetch running (and its error unretrieved)
+                if next_page:
+                    next_page.cancel()
+                raise
         
         return letter_communities
     
-    def scrape_communities(self):
+    async def scrape_communities(self):
         """Main scraping method"""
-        print(f"Starting to scrape communities from: {self.base_url}")
-        
-        # Get the main page
-        response = self.get_page(self.base_url)
-        if not response:
-            print("Failed to fetch the main page")
-            return
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Find index letter links
-        index_links = self.find_index_letter_links(soup)
-        print(f"Found {len(index_links)} index letter links")
-        
-        if not index_links:
-            print("No index letter links found. Trying to extract from main page...")
-            main_communities = self.extract_communities_from_page(soup)
-            self.communities.extend(main_communities)
-            print(f"Found {len(main_communities)} communities on main page")
-            return
-        
-        # Scrape each letter page
-        for i, link in enumerate(index_links):
-            letter = link.split('l-')[-1].split('.')[0] if 'l-' in link else f"page_{i+1}"
-            print(f"\nScraping letter {letter} ({i+1}/{len(index_links)})")
+        # Stream names to disk as letters finish
+        self._csvfile = open(self._partial_path, 'w', newline='', encoding='utf-8', buffering=1 << 20)
+        self._writer = csv.writer(self._csvfile, lineterminator='\n')
+        self._writer.writerow(['Community Name'])
+        try:
+            async with self.client:
+                await self._scrape_communities()
+        finally:
+            self._csvfile.close()
+    
+    async def _scrape_communities(self):
+        """Find the letter pages and scrape every one of them"""
+        logger.info("Starting to scrape communities from: %s", self.base_url)
+        
+        if self.letter_url_template:
+            # Letter URLs are known up front, which saves the index round-trip
+            letters = list(INDEX_LETTERS)
+            index_links = [self.letter_url_template.format(letter=letter) for letter in letters]
+            logger.info("Built %d index letter links from the URL template", len(index_links))
+        else:
+            # Get the main page
+            response = await self.get_page(self.base_url)
+            if not response:
+                logger.error("Failed to fetch the main page")
+                return
+            
+            page_text = self.decode_page(response)
+            tree = LexborHTMLParser(page_text)
             
-            letter_communities = self.scrape_letter_page(link, letter)
-            self.communities.extend(letter_communities)
+            # Find index letter links
+            index_links = list(dict.fromkeys(self.find_index_letter_links(tree)))
+            logger.info("Found %d index letter links", len(index_links))
             
-            print(f"Total communities found for {letter}: {len(letter_communities)}")
+            if not index_links:
+                logger.info("No index letter links found. Trying to extract from main page...")
+                main_communities = self.extract_communities_from_page(tree)
+                self.write_communities(main_communities)
+                logger.info("Found %d communities on main page", len(main_communities))
+                return
             
-            # Be respectful to the server
-            time.sleep(2)
+            letters = [
+                match.group(1) if (match := LETTER_RE.match(link)) else f"page_{i+1}"
+                for i, link in enumerate(index_links)
+            ]
         
-        # Remove duplicates and clean up
-        self.communities = list(set(self.communities))
-        self.communities = [name for name in self.communities if len(name.strip()) > 2]
+        # Scrape all letter pages concurrently; the semaphore bounds the load
+        logger.info("Scraping %d letters: %s", len(letters), ', '.join(letters))
         
-        print(f"\nTotal unique communities found: {len(self.communities)}")
+        tasks = [self.scrape_letter(link, letter) for link, letter in zip(index_links, letters)]
+        await asyncio.gather(*tasks)
         
-    def save_to_csv(self, filename='orkut_communities.csv'):
-        """Save communities to CSV file"""
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
+        logger.info("Total unique communities found: %d", len(self.communities))
+    
+    async def scrape_letter(self, letter_url, letter):
+        """Scrape one letter and append its new communities to the CSV"""
+        letter_communities = await self.scrape_letter_page(letter_url, letter)
+        self.write_communities(letter_communities)
+        logger.info("Total communities found for %s: %d", letter, len(letter_communities))
+    
+    def write_communities(self, names):
+        """Append names not seen before to the CSV stream"""
+        new_names = names - self.communities
+        self._writer.writerows([community] for community in new_names)
+        self._csvfile.flush()
+        self.communities.update(new_names)
+        
+    def save_to_csv(self, filename=None):
+        """Save communities sorted to CSV, atomically replacing the file"""
+        filename = filename or self.filename
+        temp_path = f"{filename}.tmp"
+        with open(temp_path, 'w', newline='', encoding='utf-8', buffering=4 * 1024 * 1024) as csvfile:
+            writer = csv.writer(csvfile, lineterminator='\n')
             writer.writerow(['Community Name'])
-            for community in sorted(self.communities):
-                writer.writerow([community])
-        print(f"Communities saved to {filename}")
+            writer.writerows([community] for community in sorted(self.communities))
+        os.replace(temp_path, filename)
+        
+        # The unsorted stream is no longer needed once the sorted file is in place
+        try:
+            os.remove(self._partial_path)
+        except FileNotFoundError:
+            pass
+        logger.info("Communities saved to %s", filename)
     
     def print_communities(self):
         """Print all found communities"""
@@ -209,11 +357,12 @@ class OrkutCommunityScraper:
         for i, community in enumerate(sorted(self.communities), 1):
             print(f"{i:3d}. {community}")
 
-def main():
+async def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
     url = "https://web.archive.org/web/20141001005309/http://orkut.google.com/"
     
     scraper = OrkutCommunityScraper(url)
-    scraper.scrape_communities()
+    await scraper.scrape_communities()
     
     # Display results
     scraper.print_communities()
@@ -221,7 +370,7 @@ def main():
     # Save to CSV
     scraper.save_to_csv()
     
-    print(f"\nScraping completed! Found {len(scraper.communities)} unique communities.")
+    logger.info("Scraping completed! Found %d unique communities.", len(scraper.communities))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file